@@ -1,15 +1,27 @@
 import streamlit as st
 import pandas as pd
 import re
-from urllib.parse import urlparse
-import json
+from urllib.parse import urlparse, urlencode
+import asyncio
+import html
+import io
 import time
+import functools
+from collections import defaultdict, deque
+from itertools import islice
+from pathlib import Path
 from datetime import datetime
+from typing import NamedTuple, Optional
 
 # Check for required packages
 try:
-    import requests
-    from bs4 import BeautifulSoup
+    import aiohttp
+    from bs4 import BeautifulSoup, ParserRejectedMarkup, SoupStrainer
+    import lxml
+    import orjson
+    import soupsieve
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
     PACKAGES_AVAILABLE = True
 except ImportError as e:
     PACKAGES_AVAILABLE = False
@@ -23,45 +35,12 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
-<style>
-    .main-header {
-        text-align: center;
-        padding: 2rem 0;
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        margin: -1rem -1rem 2rem -1rem;
-        border-radius: 0 0 10px 10px;
-    }
-    .comment-card {
-        border: 1px solid #e0e0e0;
-        border-radius: 10px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        background: #f9f9f9;
-    }
-    .comment-author {
-        font-weight: bold;
-        color: #4a90e2;
-    }
-    .comment-date {
-        color: #666;
-        font-size: 0.9em;
-    }
-    .stats-container {
-        display: flex;
-        justify-content: space-around;
-        margin: 1rem 0;
-    }
-    .stat-box {
-        text-align: center;
-        padding: 1rem;
-        background: #f0f2f6;
-        border-radius: 10px;
-        min-width: 100px;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_data
+def load_css():
+    """Read the stylesheet once; the tag itself must still be sent every rerun"""
+    return f"<style>\n{(Path(__file__).parent / 'static' / 'styles.css').read_text()}</style>"
+
+st.html(load_css())
 
 # Header
 st.markdown('<div class="main-header"><h1>💬 Comment Extractor</h1><p>Extract comments and responses from various platforms</p></div>', unsafe_allow_html=True)
@@ -73,17 +52,17 @@ if not PACKAGES_AVAILABLE:
     This app requires additional packages to be installed. Please run the following command in your terminal:
     
     ```bash
-    pip install requests beautifulsoup4
+    pip install aiohttp beautifulsoup4 lxml orjson pyarrow
     ```
     
     **Or install all requirements at once:**
     ```bash
-    pip install streamlit requests beautifulsoup4 pandas lxml
+    pip install streamlit aiohttp beautifulsoup4 pandas lxml orjson pyarrow
     ```
     
     **If using conda:**
     ```bash
-    conda install requests beautifulsoup4 pandas lxml
+    conda install aiohttp beautifulsoup4 pandas lxml orjson pyarrow
     ```
     
     After installation, restart the Streamlit app.
@@ -92,106 +71,267 @@ if not PACKAGES_AVAILABLE:
     st.info(f"**Error details:** {MISSING_PACKAGES}")
     st.stop()  # Stop execution here
 
+class Comment(NamedTuple):
+    """A single extracted comment"""
+    author: str
+    text: str
+    score: Optional[int]
+    created_utc: str  # ISO timestamp
+    depth: int
+    id: str
+    permalink: Optional[str] = None
+    source: Optional[str] = None  # Selector that matched, for generic pages
+
 class CommentExtractor:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    # Common comment selectors, tried in order
+    COMMENT_SELECTORS = [
+        '.comment', '.comment-item', '.comment-content',
+        '[class*="comment"]', '[id*="comment"]',
+        '.reply', '.response', '.discussion-item'
+    ]
     
-    def extract_reddit_comments(self, url):
-        """Extract comments from Reddit posts"""
+    # Transient responses worth retrying
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    
+    class IncompleteExtraction(Exception):
+        """Raised when part of a thread could not be loaded; carries what was"""
+        def __init__(self, comments, missing):
+            super().__init__(f"{missing} comments could not be loaded")
+            self.comments = comments
+            self.missing = missing
+    
+    def __init__(self, max_connections=20, timeout=30, max_retries=3, backoff_factor=1.0):
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept-Encoding': 'gzip, deflate'
+        }
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        
+        # Compile once; the extractor itself is cached per process
+        self.comment_matchers = [soupsieve.compile(selector) for selector in self.COMMENT_SELECTORS]
+        
+        # The strained pass only builds subtrees with a "comment" class, so it
+        # can only run the class selectors that come before the id selector;
+        # the full-page fallback runs the whole list in order
+        self.comment_strainer = SoupStrainer(class_=re.compile('comment'))
+        self.strained_matchers = self.comment_matchers[:self.COMMENT_SELECTORS.index('[id*="comment"]')]
+    
+    async def _afetch(self, session, url):
+        """Fetch a URL and return the raw response body, retrying transient failures"""
+        async def fetch():
+            async with session.get(url) as response:
+                response.raise_for_status()
+                return await response.read()
+        
+        for attempt in range(self.max_retries + 1):
+            delay = self.backoff_factor * 2 ** attempt
+            try:
+                return await asyncio.wait_for(fetch(), timeout=self.timeout)
+            except aiohttp.ClientResponseError as e:
+                if e.status not in self.RETRY_STATUSES or attempt == self.max_retries:
+                    raise
+                # Honour the server's rate-limit hint, within the request timeout
+                retry_after = (e.headers or {}).get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = max(delay, min(int(retry_after), self.timeout))
+            except aiohttp.ClientConnectionError:
+                if attempt == self.max_retries:
+                    raise
+            except asyncio.TimeoutError:
+                if attempt == self.max_retries:
+                    # wait_for's TimeoutError has no message of its own
+                    raise asyncio.TimeoutError(f"timed out after {self.timeout}s fetching {url}") from None
+            await asyncio.sleep(delay)
+    
+    async def _afetch_json(self, session, url):
+        """Fetch a URL and decode its JSON body straight from the response bytes"""
+        return orjson.loads(await self._afetch(session, url))
+    
+    def parse_html(self, content, parse_only=None):
+        """Parse HTML with lxml, falling back to html.parser on broken markup"""
         try:
-            # Convert to JSON API endpoint
-            if not url.endswith('.json'):
-                url = url.rstrip('/') + '.json'
+            return BeautifulSoup(content, 'lxml', parse_only=parse_only)
+        except ParserRejectedMarkup:
+            return BeautifulSoup(content, 'html.parser', parse_only=parse_only)
+    
+    def select_comments(self, soup, matchers):
+        """Collect comments from the first selector that matches anything useful"""
+        comments = []
+        
+        for matcher in matchers:
+            comment_elements = matcher.select(soup, limit=50)  # Limit to 50
+            if comment_elements:
+                for i, element in enumerate(comment_elements):
+                    text = element.get_text(strip=True)
+                    if len(text) > 10:  # Filter out very short texts
+                        comments.append(Comment(
+                            author='Unknown',
+                            text=text[:500] + '...' if len(text) > 500 else text,
+                            score=None,
+                            created_utc=datetime.now().isoformat(),
+                            depth=0,
+                            id=f'generic_{i}',
+                            source=matcher.pattern
+                        ))
+                if comments:
+                    break
+        
+        return comments
+    
+    def collect_more_ids(self, children):
+        """Collect the comment ids hidden behind Reddit's "load more comments" stubs"""
+        more_ids = []
+        stack = list(children)
+        while stack:
+            obj = stack.pop()
+            if obj['kind'] == 'more':
+                more_ids.extend(obj['data'].get('children', []))
+            elif obj['kind'] == 't1':
+                replies = obj['data'].get('replies')
+                if replies and isinstance(replies, dict):
+                    stack.extend(replies['data']['children'])
+        return more_ids
+    
+    async def fetch_more_children(self, session, link_id, more_ids):
+        """Fetch collapsed Reddit comments grouped by parent id, with the number of ids that failed"""
+        # Reddit only allows one morechildren request at a time
+        semaphore = asyncio.Semaphore(1)
+        
+        async def fetch_batch(batch):
+            async with semaphore:
+                return await self._afetch_json(session, 'https://www.reddit.com/api/morechildren.json?' + urlencode({
+                    'api_type': 'json',
+                    'link_id': link_id,
+                    'children': ','.join(batch),
+                    'raw_json': 1
+                }))
+        
+        children_by_parent = defaultdict(list)
+        missing = 0
+        requested = set(more_ids)
+        pending = list(more_ids)
+        
+        # Responses can contain further "more" stubs; keep following them
+        while pending:
+            batches = [pending[i:i + 100] for i in range(0, len(pending), 100)]
+            pending = []
+            responses = await asyncio.gather(*(fetch_batch(batch) for batch in batches), return_exceptions=True)
             
-            response = self.session.get(url)
-            response.raise_for_status()
-            data = response.json()
+            for batch, response in zip(batches, responses):
+                if isinstance(response, Exception):
+                    missing += len(batch)  # Keep whatever the other batches returned
+                    continue
+                things = response.get('json', {}).get('data', {}).get('things', [])
+                for thing in things:
+                    if thing['kind'] == 't1':
+                        children_by_parent[thing['data'].get('parent_id')].append(thing)
+                    elif thing['kind'] == 'more':
+                        new_ids = [i for i in thing['data'].get('children', []) if i not in requested]
+                        requested.update(new_ids)
+                        pending.extend(new_ids)
+        
+        return children_by_parent, missing
+    
+    async def extract_reddit_comments(self, session, url):
+        """Extract comments from Reddit posts"""
+        # Convert to JSON API endpoint, asking for as many comments as Reddit allows
+        parsed = urlparse(url)
+        path = parsed.path.rstrip('/')
+        if not path.endswith('.json'):
+            path += '.json'
+        url = parsed._replace(path=path, query='limit=500&raw_json=1').geturl()
+        
+        data = await self._afetch_json(session, url)
+        
+        comments = []
+        more_children = {}
+        missing = 0
+        
+        # Handle Reddit JSON structure
+        if isinstance(data, list) and len(data) > 1:
+            link_id = data[0]['data']['children'][0]['data']['name']
+            comments_data = data[1]['data']['children']
+            
+            # Load collapsed comments; they are attached to their parents below
+            more_ids = self.collect_more_ids(comments_data)
+            more_children, missing = await self.fetch_more_children(session, link_id, more_ids) if more_ids else ({}, 0)
             
-            comments = []
+            comments_append = comments.append
             
-            # Handle Reddit JSON structure
-            if isinstance(data, list) and len(data) > 1:
-                comments_data = data[1]['data']['children']
+            # Walk the reply tree depth-first with an explicit stack;
+            # children are pushed reversed so they pop in thread order
+            top_level = comments_data + more_children.pop(link_id, [])
+            stack = deque((comment, 0) for comment in reversed(top_level))
+            while stack:
+                comment_obj, depth = stack.pop()
+                if comment_obj['kind'] != 't1':  # Not a comment
+                    continue
                 
-                def parse_comment(comment_obj, depth=0):
-                    if comment_obj['kind'] == 't1':  # Comment
-                        comment_data = comment_obj['data']
-                        comments.append({
-                            'author': comment_data.get('author', '[deleted]'),
-                            'text': comment_data.get('body', '[deleted]'),
-                            'score': comment_data.get('score', 0),
-                            'created_utc': datetime.fromtimestamp(comment_data.get('created_utc', 0)),
-                            'depth': depth,
-                            'id': comment_data.get('id', ''),
-                            'permalink': f"https://reddit.com{comment_data.get('permalink', '')}"
-                        })
-                        
-                        # Parse replies
-                        if 'replies' in comment_data and comment_data['replies']:
-                            if isinstance(comment_data['replies'], dict):
-                                for reply in comment_data['replies']['data']['children']:
-                                    parse_comment(reply, depth + 1)
+                comment_data = comment_obj['data']
+                comments_append(Comment(
+                    author=comment_data.get('author', '[deleted]'),
+                    text=comment_data.get('body', '[deleted]'),
+                    score=comment_data.get('score', 0),
+                    created_utc=datetime.fromtimestamp(comment_data.get('created_utc', 0)).isoformat(),
+                    depth=depth,
+                    id=comment_data.get('id', ''),
+                    permalink=f"https://reddit.com{comment_data.get('permalink', '')}"
+                ))
                 
-                for comment in comments_data:
-                    parse_comment(comment)
-            
-            return comments
-            
-        except Exception as e:
-            st.error(f"Error extracting Reddit comments: {str(e)}")
-            return []
+                # Queue replies; those loaded from "more" stubs come after
+                # the inline ones, so they are pushed first
+                child_depth = depth + 1
+                loaded = more_children.pop(comment_data.get('name'), None)
+                if loaded:
+                    stack.extend((reply, child_depth) for reply in reversed(loaded))
+                replies = comment_data.get('replies')
+                if replies and isinstance(replies, dict):
+                    stack.extend((reply, child_depth) for reply in reversed(replies['data']['children']))
+        
+        # Anything not attached during the walk has a parent that was never reached
+        missing += sum(len(children) for children in more_children.values())
+        
+        if missing:
+            # Raising keeps the partial thread out of the st.cache_data cache
+            raise self.IncompleteExtraction(comments, missing)
+        
+        return comments
     
-    def extract_generic_comments(self, url):
+    async def extract_generic_comments(self, session, url):
         """Extract comments using generic HTML parsing"""
-        try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            comments = []
-            
-            # Common comment selectors
-            comment_selectors = [
-                '.comment', '.comment-item', '.comment-content',
-                '[class*="comment"]', '[id*="comment"]',
-                '.reply', '.response', '.discussion-item'
-            ]
-            
-            for selector in comment_selectors:
-                comment_elements = soup.select(selector)
-                if comment_elements:
-                    for i, element in enumerate(comment_elements[:50]):  # Limit to 50
-                        text = element.get_text(strip=True)
-                        if len(text) > 10:  # Filter out very short texts
-                            comments.append({
-                                'author': 'Unknown',
-                                'text': text[:500] + '...' if len(text) > 500 else text,
-                                'score': None,
-                                'created_utc': datetime.now(),
-                                'depth': 0,
-                                'id': f'generic_{i}',
-                                'source': selector
-                            })
-                    if comments:
-                        break
-            
-            return comments
-            
-        except Exception as e:
-            st.error(f"Error extracting generic comments: {str(e)}")
-            return []
+        content = await self._afetch(session, url)
+        comments = self.select_comments(self.parse_html(content, parse_only=self.comment_strainer), self.strained_matchers)
+        
+        if not comments:
+            # Nothing matched a comment class, so retry on the full page
+            comments = self.select_comments(self.parse_html(content), self.comment_matchers)
+        
+        return comments
     
-    def extract_comments(self, url):
-        """Main method to extract comments based on URL"""
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def classify_url(url):
+        """Return the platform a URL belongs to: 'reddit' or 'generic'"""
         domain = urlparse(url).netloc.lower()
+        return 'reddit' if 'reddit.com' in domain else 'generic'
+    
+    async def aextract(self, url):
+        """Main method to extract comments based on URL"""
+        extractors = {
+            'reddit': self.extract_reddit_comments,
+            'generic': self.extract_generic_comments
+        }
+        extract = extractors[self.classify_url(url)]
         
-        if 'reddit.com' in domain:
-            return self.extract_reddit_comments(url)
-        else:
-            return self.extract_generic_comments(url)
+        # The session is bound to the running event loop, so it lives only
+        # as long as this call rather than on the (shared) extractor; within
+        # the call, keep-alive connections are reused across requests
+        connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector) as session:
+            return await extract(session, url)
 
 # Initialize extractor
 @st.cache_resource
@@ -200,6 +340,127 @@ def get_extractor():
 
 extractor = get_extractor()
 
+@st.cache_data(ttl=600, max_entries=128, show_spinner=False)
+def fetch_comments(url):
+    """Extract comments for a URL, reusing results across reruns"""
+    # Comment is redefined on every rerun, so it can't be pickled by
+    # reference; cache plain tuples and rebuild the records on the way out
+    return [tuple(c) for c in asyncio.run(extractor.aextract(url))]
+
+def format_date(value, default='N/A'):
+    """Format an ISO timestamp stored on a comment for display"""
+    try:
+        return datetime.fromisoformat(value).strftime('%Y-%m-%d %H:%M')
+    except (TypeError, ValueError):
+        return default
+
+def comments_table(comments):
+    """Build the table shown and exported for a sequence of comments"""
+    df = pd.DataFrame(comments)
+    text = df['text']
+    df['Comment'] = text.str.slice(0, 100).where(text.str.len() <= 100, text.str.slice(0, 100) + '...')
+    df['Date'] = pd.to_datetime(df['created_utc'], format='ISO8601', errors='coerce').dt.strftime('%Y-%m-%d %H:%M').fillna('N/A')
+    return df[['author', 'Comment', 'score', 'Date', 'depth']].rename(columns={
+        'author': 'Author',
+        'score': 'Score',
+        'depth': 'Depth'
+    })
+
+def to_csv_bytes(df):
+    """Serialize a table to CSV with Arrow's C++ writer"""
+    buffer = io.BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buffer)
+    return buffer.getvalue()
+
+def to_parquet_bytes(df):
+    """Serialize a table to zstd-compressed Parquet"""
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, engine='pyarrow', compression='zstd', index=False)
+    return buffer.getvalue()
+
+# Cards rendered per st.markdown call in the card view
+CARDS_PER_MESSAGE = 200
+
+@st.fragment
+def _render_results(comments):
+    """Render the display options and comment views, rerunning only this section"""
+    # Display options
+    st.markdown("### 📋 Display Options")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        show_table = st.checkbox("Show as Table", value=True)
+    with col2:
+        show_cards = st.checkbox("Show as Cards", value=False)
+    with col3:
+        max_comments = st.slider("Max comments to display", 10, 100, 50)
+    
+    # Create DataFrame for table view
+    if show_table:
+        st.markdown("### 📄 Comments Table")
+        
+        st.dataframe(comments_table(islice(comments, max_comments)), use_container_width=True)
+        
+        # Download buttons export every extracted comment, like the JSON export;
+        # the files are only built when a button is clicked, not on every rerun
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="📥 Download as CSV",
+                data=lambda: to_csv_bytes(comments_table(comments)),
+                file_name=f"comments_{timestamp}.csv",
+                mime="text/csv"
+            )
+        with col2:
+            st.download_button(
+                label="📥 Download as Parquet",
+                data=lambda: to_parquet_bytes(comments_table(comments)),
+                file_name=f"comments_{timestamp}.parquet",
+                mime="application/vnd.apache.parquet"
+            )
+    
+    # Card view
+    if show_cards:
+        st.markdown("### 💬 Comments Feed")
+        
+        # Build every card up front and send them in a few large messages
+        cards = []
+        cards_append = cards.append
+        for comment in islice(comments, max_comments):
+            depth = comment.depth
+            # Indentation for nested comments
+            indent = "  " * depth
+            # Blank lines would end the HTML block inside the markdown message
+            text = html.escape(comment.text).replace('\n', '<br>')
+            score = comment.score
+            
+            cards_append(
+                f'<div class="comment-card" style="margin-left: {depth * 20}px;">'
+                f'<div class="comment-author">{indent}👤 {html.escape(comment.author)}</div>'
+                f'<div class="comment-date">📅 {format_date(comment.created_utc, "Unknown date")}</div>'
+                f'<div style="margin-top: 0.5rem;">{text}</div>'
+                + (f'<div style="margin-top: 0.5rem; color: #666;">👍 Score: {score}</div>' if score is not None else '')
+                + '</div>'
+            )
+        
+        for start in range(0, len(cards), CARDS_PER_MESSAGE):
+            st.markdown("\n".join(cards[start:start + CARDS_PER_MESSAGE]), unsafe_allow_html=True)
+    
+    # JSON export option
+    if st.checkbox("🔧 Show raw JSON data"):
+        st.json([c._asdict() for c in islice(comments, 5)])  # Show first 5 for preview
+        
+        st.download_button(
+            label="📥 Download as JSON",
+            data=lambda: orjson.dumps([c._asdict() for c in comments], default=str, option=orjson.OPT_INDENT_2),
+            file_name=f"comments_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json"
+        )
+
+# Keep the last extraction across reruns triggered by other widgets
+st.session_state.setdefault("comments", None)
+st.session_state.setdefault("source_url", None)
+
 # Main interface
 col1, col2 = st.columns([3, 1])
 
@@ -213,109 +474,71 @@ with col1:
 with col2:
     st.write("")  # Spacing
     extract_button = st.button("🔍 Extract Comments", type="primary")
+    refresh_button = st.button("🔄 Force refresh", help="Ignore cached results and fetch the page again")
 
 # Platform detection and info
 if url_input:
-    domain = urlparse(url_input).netloc.lower()
-    if 'reddit.com' in domain:
+    if extractor.classify_url(url_input) == 'reddit':
         st.info("🎯 Reddit URL detected - will use Reddit API for better results")
     else:
         st.info("🌐 Generic URL - will attempt HTML parsing")
 
 # Extract comments when button is pressed
-if extract_button and url_input:
-    with st.spinner("Extracting comments..."):
-        comments = extractor.extract_comments(url_input)
+if (extract_button or refresh_button) and url_input:
+    if refresh_button:
+        fetch_comments.clear()
     
+    # Failures raise out of fetch_comments, so they are never cached
+    with st.spinner("Extracting comments..."):
+        try:
+            st.session_state["comments"] = [Comment._make(c) for c in fetch_comments(url_input)]
+        except extractor.IncompleteExtraction as e:
+            st.warning(f"⚠️ {e.missing} collapsed comments could not be loaded (Reddit may be rate limiting). Extract again to retry.")
+            st.session_state["comments"] = [Comment._make(c) for c in e.comments]
+        except Exception as e:
+            platform = 'Reddit' if extractor.classify_url(url_input) == 'reddit' else 'generic'
+            st.error(f"Error extracting {platform} comments: {str(e)}")
+            st.session_state["comments"] = []
+    st.session_state["source_url"] = url_input
+
+# Display the last extraction results
+comments = st.session_state["comments"]
+if comments is not None:
     if comments:
         # Display statistics
         st.markdown("### 📊 Extraction Results")
         
+        # Gather all statistics in a single pass
+        total_length = 0
+        authors = set()
+        score_sum = 0
+        score_count = 0
+        for c in comments:
+            total_length += len(c.text)
+            author = c.author
+            if author != 'Unknown':
+                authors.add(author)
+            score = c.score
+            if score is not None:
+                score_sum += score
+                score_count += 1
+        
         col1, col2, col3, col4 = st.columns(4)
         with col1:
             st.metric("Total Comments", len(comments))
         with col2:
-            authors = set(c['author'] for c in comments if c['author'] != 'Unknown')
             st.metric("Unique Authors", len(authors))
         with col3:
-            avg_length = sum(len(c['text']) for c in comments) / len(comments)
+            avg_length = total_length / len(comments)
             st.metric("Avg Length", f"{avg_length:.0f} chars")
         with col4:
-            scored_comments = [c for c in comments if c.get('score') is not None]
-            if scored_comments:
-                avg_score = sum(c['score'] for c in scored_comments) / len(scored_comments)
+            if score_count:
+                avg_score = score_sum / score_count
                 st.metric("Avg Score", f"{avg_score:.1f}")
             else:
                 st.metric("Avg Score", "N/A")
         
-        # Display options
-        st.markdown("### 📋 Display Options")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            show_table = st.checkbox("Show as Table", value=True)
-        with col2:
-            show_cards = st.checkbox("Show as Cards", value=False)
-        with col3:
-            max_comments = st.slider("Max comments to display", 10, 100, 50)
-        
-        # Filter comments
-        display_comments = comments[:max_comments]
-        
-        # Create DataFrame for table view
-        if show_table:
-            st.markdown("### 📄 Comments Table")
-            
-            df_data = []
-            for comment in display_comments:
-                df_data.append({
-                    'Author': comment['author'],
-                    'Comment': comment['text'][:100] + '...' if len(comment['text']) > 100 else comment['text'],
-                    'Score': comment.get('score', 'N/A'),
-                    'Date': comment['created_utc'].strftime('%Y-%m-%d %H:%M') if isinstance(comment['created_utc'], datetime) else 'N/A',
-                    'Depth': comment.get('depth', 0)
-                })
-            
-            df = pd.DataFrame(df_data)
-            st.dataframe(df, use_container_width=True)
-            
-            # Download button
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download as CSV",
-                data=csv,
-                file_name=f"comments_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
-        
-        # Card view
-        if show_cards:
-            st.markdown("### 💬 Comments Feed")
-            
-            for i, comment in enumerate(display_comments):
-                with st.container():
-                    # Indentation for nested comments
-                    indent = "  " * comment.get('depth', 0)
-                    
-                    st.markdown(f"""
-                    <div class="comment-card" style="margin-left: {comment.get('depth', 0) * 20}px;">
-                        <div class="comment-author">{indent}👤 {comment['author']}</div>
-                        <div class="comment-date">📅 {comment['created_utc'].strftime('%Y-%m-%d %H:%M') if isinstance(comment['created_utc'], datetime) else 'Unknown date'}</div>
-                        <div style="margin-top: 0.5rem;">{comment['text']}</div>
-                        {f'<div style="margin-top: 0.5rem; color: #666;">👍 Score: {comment["score"]}</div>' if comment.get('score') is not None else ''}
-                    </div>
-                    """, unsafe_allow_html=True)
-        
-        # JSON export option
-        if st.checkbox("🔧 Show raw JSON data"):
-            st.json(comments[:5])  # Show first 5 for preview
-            
-            json_data = json.dumps(comments, default=str, indent=2)
-            st.download_button(
-                label="📥 Download as JSON",
-                data=json_data,
-                file_name=f"comments_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json"
-            )
+        _render_results(comments)
     
     else:
         st.warning("⚠️ No comments found. This could be due to:")